@@ -0,0 +1,425 @@
+import asyncio
+import collections
+import functools
+import hashlib
+import re
+import subprocess
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from colorama import Fore, Style
+
+__all__ = ["connect_bq", "q", "send_gchat", "send_gchats", "get_user_email", "cprint"]
+
+# Heavy dependencies (pandas, google-cloud-*, requests, IPython) are imported
+# inside the functions that use them so that importing this module stays cheap.
+
+_SGT = timezone(timedelta(hours=8), "SGT")
+_bq_client = None  # bigquery.Client, created by connect_bq()
+_bqstorage_client = None  # bigquery_storage.BigQueryReadClient, ditto
+# Statement types that never produce a result set worth downloading.
+_NO_ROWS_STATEMENT_TYPES = frozenset(
+    {
+        "INSERT",
+        "UPDATE",
+        "DELETE",
+        "MERGE",
+        "TRUNCATE_TABLE",
+        "EXPORT_DATA",
+        "LOAD_DATA",
+    }
+)
+_NO_ROWS_STATEMENT_PREFIXES = ("CREATE_", "DROP_", "ALTER_")
+# Block comments, string literals and quoted identifiers are matched first and
+# kept verbatim, so quotes, "--", "#" and whitespace inside them are never rewritten.
+_SQL_TOKEN_RE = re.compile(
+    r"""(/\*[\s\S]*?\*/|'''[\s\S]*?'''|"{3}[\s\S]*?"{3}|'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*"|`[^`]*`)"""
+    r"|(\s*(?:--|#)[^\n]*)"
+    r"|(\s+)"
+)
+# A leading #legacySQL/#standardSQL line selects the dialect; it is not a comment.
+_DIALECT_RE = re.compile(r"\s*(#(?:legacy|standard)SQL)\b[^\n]*", re.IGNORECASE)
+_ERR_POS_RE = re.compile(r"\[(\d+):(\d+)\]")
+_NONDETERMINISTIC_RE = re.compile(
+    r"\b(CURRENT_TIMESTAMP|CURRENT_DATETIME|CURRENT_DATE|CURRENT_TIME|RAND|GENERATE_UUID|SESSION_USER)\b",
+    re.IGNORECASE,
+)
+
+# Process-local cache of q() results, keyed on the project and canonical SQL.
+_RESULT_CACHE = collections.OrderedDict()  # key -> (stored at, DataFrame, bytes)
+_RESULT_CACHE_MAX = 64
+_RESULT_CACHE_MAX_BYTES = 512 * 2**20  # by DataFrame.memory_usage(deep=True)
+_RESULT_CACHE_TTL = 3600  # seconds
+_result_cache_stats = {"hits": 0, "misses": 0}
+_CacheInfo = collections.namedtuple(
+    "CacheInfo", ["hits", "misses", "maxsize", "currsize", "nbytes"]
+)
+
+_GCHAT_HEADERS = {"Content-Type": "application/json; charset=UTF-8"}
+
+
+@functools.lru_cache(maxsize=1)
+def _session():
+    """
+    Keep-alive session shared by webhook posts so each message skips the TLS handshake.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=10,
+            max_retries=Retry(total=3, backoff_factor=0.3),
+        ),
+    )
+    return session
+
+
+def _canonicalize_token(match):
+    literal, comment, whitespace = match.groups()
+    if literal:
+        return literal
+    if comment:
+        return ""
+    return "\n" if "\n" in whitespace else " "
+
+
+def _canonicalize(query):
+    """
+    Strip comments and redundant whitespace so that equivalent query texts
+    are byte-identical and can hit the BigQuery results cache. Line breaks are
+    kept so that error positions still point at readable lines.
+    """
+    dialect = ""
+    if match := _DIALECT_RE.match(query):
+        dialect, query = f"{match.group(1)}\n", query[match.end() :]
+    return dialect + _SQL_TOKEN_RE.sub(_canonicalize_token, query).strip()
+
+
+def _nondeterministic_calls(query):
+    """
+    Non-deterministic functions called by the query, which BigQuery never
+    serves from its cache. Literals, quoted identifiers and comments are
+    blanked out first so that e.g. 'rand' or `current_date` do not count.
+    """
+    code = _SQL_TOKEN_RE.sub(lambda m: m.group(0) if m.group(3) else " ", query)
+    return sorted({f.upper() for f in _NONDETERMINISTIC_RE.findall(code)})
+
+
+def _job_id_prefix(query):
+    """
+    Readable job ID prefix derived from the canonical SQL. The library appends
+    a random suffix and reuses the full ID across insert retries.
+    """
+    return f"q_{hashlib.sha1(query.encode()).hexdigest()[:24]}_"
+
+
+def _first_page_is_complete(rows):
+    """
+    Whether the page result() already fetched holds every row, in which case
+    the Storage API would only add an RPC. getQueryResults pages by size (about
+    10 MB), not by row count, so this is read off the page itself. It relies on
+    the RowIterator's cached first page; if that is unavailable, use the
+    Storage API.
+    """
+    first_page = getattr(rows, "_first_page_response", None)
+    if first_page is None:
+        return False
+    cached_rows = len(first_page.get("rows", []))
+    return first_page.get("pageToken") is None or cached_rows >= (rows.total_rows or 0)
+
+
+def _returns_rows(result):
+    statement_type = result.statement_type
+    if statement_type is None:
+        return result.dml_stats is None and result.ddl_target_table is None
+    return not (
+        statement_type in _NO_ROWS_STATEMENT_TYPES
+        or statement_type.startswith(_NO_ROWS_STATEMENT_PREFIXES)
+    )
+
+
+def _result_cache_key(query):
+    return hashlib.blake2b(f"{pjid}|{query}".encode(), digest_size=16).digest()
+
+
+def _result_cache_get(key):
+    entry = _RESULT_CACHE.get(key)
+    if entry is None or time.monotonic() - entry[0] > _RESULT_CACHE_TTL:
+        _RESULT_CACHE.pop(key, None)
+        _result_cache_stats["misses"] += 1
+        return None
+    _RESULT_CACHE.move_to_end(key)
+    _result_cache_stats["hits"] += 1
+    return entry[1].copy()
+
+
+def _result_cache_nbytes():
+    return sum(nbytes for _, _, nbytes in _RESULT_CACHE.values())
+
+
+def _result_cache_put(key, df):
+    nbytes = int(df.memory_usage(deep=True).sum())
+    _RESULT_CACHE.pop(key, None)
+    if nbytes > _RESULT_CACHE_MAX_BYTES:
+        return  # too large to keep alongside the caller's copy
+    _RESULT_CACHE[key] = (time.monotonic(), df.copy(), nbytes)
+    while (
+        len(_RESULT_CACHE) > _RESULT_CACHE_MAX
+        or _result_cache_nbytes() > _RESULT_CACHE_MAX_BYTES
+    ):
+        _RESULT_CACHE.popitem(last=False)
+
+
+def connect_bq(pjid_new=None):
+    """
+    Authenticate the user and set the project ID for BigQuery.
+
+    :param pjid_new: The new project ID to authenticate.
+
+    :return: None
+    """
+    from google.cloud import bigquery, bigquery_storage
+    from google.colab import auth
+
+    global pjid, _bq_client, _bqstorage_client
+
+    auth.authenticate_user()
+    _bq_client = bigquery.Client(project=pjid_new)
+    _bqstorage_client = bigquery_storage.BigQueryReadClient()
+    message = f"pjid: {pjid_new} authenticated at: {datetime.now(_SGT):%Y-%m-%d %H:%M}"
+    cprint(message, color=Fore.GREEN, style=Style.BRIGHT)
+    pjid = pjid_new
+
+
+def q(query, no_cache=False, job_timeout_ms=None):
+    """
+    Execute a BigQuery query and return the result as a DataFrame.
+
+    Results of deterministic SELECT queries are kept in a process-local LRU
+    cache for _RESULT_CACHE_TTL seconds, up to _RESULT_CACHE_MAX entries and
+    _RESULT_CACHE_MAX_BYTES in total; larger results are not cached. See
+    q.cache_info() and q.cache_clear().
+    Running any other statement through q() empties the cache, even if it
+    fails. Tables changed outside q() are not detected; pass no_cache=True to
+    read them fresh.
+    Cached frames are returned via DataFrame.copy(), which does not deep-copy
+    nested objects (REPEATED/STRUCT columns): mutating those in place also
+    changes the cached entry.
+
+    :param query: The BigQuery query to execute.
+    :param no_cache: If True, skip the local result cache and always run the query.
+    :param job_timeout_ms: If set, BigQuery cancels the job after this many milliseconds.
+
+    :return: The result of the BigQuery query as a DataFrame, or None for DDL/DML
+        statements, which return no rows.
+    """
+    from google.api_core.exceptions import GoogleAPICallError
+    from google.cloud import bigquery
+    from IPython.display import display
+
+    if _bq_client is None:
+        raise Exception("Not connected to BigQuery: call connect_bq() first")
+    query = _canonicalize(query)
+    if nondeterministic := _nondeterministic_calls(query):
+        cprint(
+            f"Query uses {', '.join(nondeterministic)}: it will bypass the BigQuery cache",
+            color=Fore.YELLOW,
+            style=Style.BRIGHT,
+        )
+    cache_key = _result_cache_key(query)
+    if not no_cache and (df := _result_cache_get(cache_key)) is not None:
+        cprint("Returning cached result", color=Fore.GREEN, style=Style.BRIGHT)
+        return df
+    job_config = bigquery.QueryJobConfig(
+        use_query_cache=True, priority=bigquery.QueryPriority.INTERACTIVE
+    )
+    if job_timeout_ms is not None:
+        job_config.job_timeout_ms = job_timeout_ms
+    result = _bq_client.query(
+        query, job_config=job_config, job_id_prefix=_job_id_prefix(query)
+    )
+    cprint(f"Job ID: {result.job_id}", color=Fore.GREEN, style=Style.BRIGHT)
+    start_time, start_datetime = time.monotonic(), datetime.now(_SGT)
+    dynamic_output = display("Query starting", display_id=True)
+    finished = threading.Event()
+
+    def update_timer():
+        while not finished.wait(1):
+            minutes, seconds = divmod(int(time.monotonic() - start_time), 60)
+            dynamic_output.update(
+                f"Query running: {minutes}m {seconds}s since {start_datetime:%Y-%m-%d %H:%M}"
+            )
+
+    timer = threading.Thread(target=update_timer, daemon=True)
+    timer.start()
+    try:
+        rows = result.result()  # long-polls getQueryResults instead of sleeping
+    except GoogleAPICallError:
+        if not result.errors:
+            raise
+        rows = None  # job failed; result.errors is reported below
+    finally:
+        finished.set()
+        timer.join()
+        if result.statement_type != "SELECT":
+            # DML, DDL and scripts may change tables that cached results read,
+            # even when they fail part way: a script can commit an INSERT and
+            # then error.
+            _RESULT_CACHE.clear()
+    minutes, seconds = divmod(int(time.monotonic() - start_time), 60)
+    dynamic_output.update(
+        f"Query finished: {minutes}m {seconds}s from {start_datetime:%Y-%m-%d %H:%M} to {datetime.now(_SGT):%H:%M}"
+    )
+    if result.errors:
+        error_messages = "\n".join([error["message"] for error in result.errors])
+        cprint(f"Query failed: {error_messages}", color=Fore.RED, style=Style.BRIGHT)
+        match = _ERR_POS_RE.search(result.errors[0]["message"])
+        if match:
+            ln, pn = map(int, match.groups())
+            lo = max(0, ln - 6)  # 5 lines either side of line ln (1-based)
+            for i, line in enumerate(query.split("\n")[lo : ln + 5], start=lo + 1):
+                cprint(
+                    f"{i}: {line[:pn-1]}\x1b[31m{line[pn-1:]}\x1b[0m"
+                    if i == ln
+                    else f"{i}: {line}",
+                    color=Fore.RED,
+                    style=Style.BRIGHT,
+                )
+        raise Exception(error_messages)
+    else:
+        destination = (
+            result.destination
+            if result.ddl_target_table is None
+            else result.ddl_target_table
+        )
+        cprint(f"Destination: {destination}", color=Fore.GREEN, style=Style.BRIGHT)
+        cprint(
+            str(result.dml_stats), color=Fore.LIGHTYELLOW_EX, style=Style.BRIGHT
+        ) if result.dml_stats else None
+        if not _returns_rows(result):
+            return None
+        if _first_page_is_complete(rows):
+            df = rows.to_dataframe(create_bqstorage_client=False)
+        else:
+            df = rows.to_dataframe(bqstorage_client=_bqstorage_client)
+        if result.statement_type == "SELECT" and not nondeterministic:
+            _result_cache_put(cache_key, df)
+        return df
+
+
+def _q_cache_info():
+    return _CacheInfo(
+        _result_cache_stats["hits"],
+        _result_cache_stats["misses"],
+        _RESULT_CACHE_MAX,
+        len(_RESULT_CACHE),
+        _result_cache_nbytes(),
+    )
+
+
+def _q_cache_clear():
+    _RESULT_CACHE.clear()
+    _result_cache_stats.update(hits=0, misses=0)
+
+
+q.cache_info = _q_cache_info
+q.cache_clear = _q_cache_clear
+
+
+def _gchat_footer():
+    return f"Sent by {get_user_email()} on {datetime.now(_SGT):%Y-%m-%d %H:%M}"
+
+
+def send_gchat(
+    message: str,
+    webhook: str,
+    footer: Optional[str] = None,
+) -> str:
+    """
+    Send a message to a Google Chat webhook.
+
+    :param message: The message to send.
+    :param webhook: The URL of the Google Chat webhook.
+    :param footer: The footer to add to the message.
+
+    :return: The response from the Google Chat webhook.
+    """
+    if footer is None:
+        footer = _gchat_footer()
+    message = f"{message}\n\n{footer}"
+    response = _session().post(webhook, headers=_GCHAT_HEADERS, json={"text": message})
+    if response.status_code == 400:
+        raise Exception(f"Error sending message: {response.text}")
+    return response.text
+
+
+async def send_gchats(
+    messages: List[str],
+    webhook: str,
+    footer: Optional[str] = None,
+) -> List[str]:
+    """
+    Send several messages to a Google Chat webhook concurrently.
+    Requires aiohttp (pip install gcolab_pkg[async]); await it from a notebook cell.
+
+    :param messages: The messages to send.
+    :param webhook: The URL of the Google Chat webhook.
+    :param footer: The footer to add to each message.
+
+    :return: The responses from the Google Chat webhook, in message order.
+    """
+    import aiohttp
+
+    if footer is None:
+        footer = _gchat_footer()
+
+    async def post(session, message):
+        async with session.post(
+            webhook, headers=_GCHAT_HEADERS, json={"text": f"{message}\n\n{footer}"}
+        ) as response:
+            text = await response.text()
+            if response.status == 400:
+                raise Exception(f"Error sending message: {text}")
+            return text
+
+    async with aiohttp.ClientSession() as session:
+        return await asyncio.gather(*(post(session, message) for message in messages))
+
+
+@functools.lru_cache(maxsize=1)
+def get_user_email():
+    """
+    Get the email of the user. The result is cached for the process.
+
+    :return: The email of the user.
+    """
+    import google.auth
+    import google.auth.transport.requests
+    from google.auth.exceptions import GoogleAuthError
+
+    try:
+        credentials, _ = google.auth.default(
+            scopes=["https://www.googleapis.com/auth/userinfo.email"]
+        )
+        credentials.refresh(google.auth.transport.requests.Request(session=_session()))
+        access_token = credentials.token
+    except GoogleAuthError:
+        access_token = subprocess.check_output(
+            ["gcloud", "auth", "print-access-token"], text=True
+        ).strip()
+    response = _session().get(
+        "https://www.googleapis.com/oauth2/v3/tokeninfo",
+        params={"access_token": access_token},
+    )
+    return response.json()["email"]
+
+
+def cprint(*args, color=Fore.WHITE, style=Style.NORMAL, **kwargs):
+    print(color + style + kwargs.get("sep", " ").join(args) + Style.RESET_ALL, **kwargs)
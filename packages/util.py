@@ -1,21 +1,62 @@
+from __future__ import annotations
+
 import glob
 import inspect
 import logging
+import os
 import re
 import time
 from datetime import datetime
 from decimal import Decimal
-from functools import wraps
+from functools import lru_cache, wraps
 from math import isnan, log10
-from pathlib import Path
-from typing import Union
+from pathlib import Path, PurePath
+from typing import TYPE_CHECKING, Union
 
-import numpy as np
-import pandas as pd
-import yaml
+# numpy, pandas and yaml are imported where they are used to keep imports cheap.
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+_WORD_RE = re.compile(r"\W|_")
+_NL_RE = re.compile(r"\s*\n+\s*")
+_WS_RE = re.compile(r"\s+")
+_FORCE_NUMBER_RE = re.compile(r"[^\d.-]+")
+# What string_to_number accepts once commas are removed: digits, at most one ".".
+_PLAIN_NUMBER_RE = re.compile(r"-?(?:\d+\.?\d*|\.\d+)")
+# Compact formats not covered by datetime.fromisoformat; strptime also accepts
+# unpadded fields here, e.g. "20240105_930" or "2024115".
+_COMPACT_DT_FORMATS = ("%Y%m%d", "%Y%m%d_%H%M", "%Y%m%d_%H%M%S")
+# Fallback for dashed inputs fromisoformat rejects, e.g. unpadded "2024-1-5".
+_DASHED_DT_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S.%f",
+)
+
+# (divisor, unit) per thousands group and decimals per power of ten, giving
+# 3 significant figures for 1 <= abs(x) < 1e9 in number_to_short_string_series.
+_SHORT_UNITS = ((1, ""), (1_000, "k"), (1_000_000, "m"))
+_SHORT_DECIMALS = (2, 1, 0) * len(_SHORT_UNITS)
+
+
+@lru_cache(maxsize=None)
+def _numpy_pandas():
+    """
+    Import numpy and pandas on first use; later calls are a cache lookup
+    rather than an import statement.
+    """
+    import numpy as np
+    import pandas as pd
+
+    return np, pd
+
 
 class DagError(Exception):
     """
@@ -28,15 +69,30 @@ class DagError(Exception):
 class HelperFunctions:
     DAG_VERSION = "20240815_1030"
 
-    def __init__(self):
-        self.tools: dict = self.get_tools()
-        self.emojis: dict = self.tools.get("emojis", {})
+    @property
+    def tools(self) -> dict:
+        return self.get_tools()
+
+    @property
+    def emojis(self) -> dict:
+        return self.tools.get("emojis", {})
 
     def get_tools(self):
-        tools = self.find_file("tools.yaml", sibling_folder_name="yamls")
+        return type(self)._load_tools()
+
+    @classmethod
+    @lru_cache(maxsize=1)
+    def _load_tools(cls) -> dict:
+        """
+        Parse tools.yaml once per process; later instances share the result.
+        """
+        import yaml
+
+        tools = cls.find_file("tools.yaml", sibling_folder_name="yamls")
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)  # libyaml if built
         try:
             with open(tools, "r", encoding="utf-8") as config_file:
-                return yaml.safe_load(config_file)
+                return yaml.load(config_file, Loader=loader)
         except (FileNotFoundError, yaml.YAMLError) as e:
             raise DagError(f"Error loading config: {e}") from e
 
@@ -50,18 +106,26 @@ class HelperFunctions:
 
         Args:
             x (Union[str, int, float, Decimal, None]): A value to convert.
+                A pd.Series or np.ndarray is converted as a whole via
+                string_to_number_series, which applies the same rules.
             force (bool): If True, attempt to clean and convert the string.
         """
-        if x is None or pd.isna(x) or (isinstance(x, float) and np.isnan(x)):
+        if x is None:
             return 0.0
         if isinstance(x, (int, float, Decimal)):
-            return float(x)
+            return 0.0 if isnan(x) else float(x)
+        if not isinstance(x, str):
+            np, pd = _numpy_pandas()
+            if isinstance(x, (pd.Series, np.ndarray)):
+                return HelperFunctions.string_to_number_series(x, force=force)
+            if pd.isna(x):
+                return 0.0
         try:
             if (y := str(x).replace(",", "")).lstrip("-").replace(".", "", 1).isdigit():
                 return float(y)
             elif force:
-                y = re.sub(r"[^\\d.-]+", "", str(x))
-                return HelperFunctions.string_to_number(y, force)
+                y = _FORCE_NUMBER_RE.sub("", str(x))
+                return HelperFunctions.string_to_number(y)
             else:
                 raise ValueError(
                     f"{x=} (type: {type(x)}) cannot be interpreted as float."
@@ -71,6 +135,50 @@ class HelperFunctions:
                 f"Error in string_to_number: {e}. Input: {x} (type: {type(x)})"
             )
 
+    @staticmethod
+    def string_to_number_series(
+        s: Union[pd.Series, np.ndarray], force: bool = False
+    ) -> np.ndarray:
+        """
+        Vectorized string_to_number for a whole column, following the same
+        rules: missing values become 0.0, strings must be plain numbers once
+        commas are removed (no exponents or padding), and any value that
+        still cannot be interpreted raises DagError.
+
+        Args:
+            s (Union[pd.Series, np.ndarray]): The values to convert.
+            force (bool): If True, attempt to clean and convert the strings.
+        """
+        np, pd = _numpy_pandas()
+
+        s = pd.Series(s, copy=False)
+        if pd.api.types.is_numeric_dtype(s):
+            return s.fillna(0.0).to_numpy(dtype=np.float64)
+        result = np.zeros(len(s), dtype=np.float64)
+        missing = s.isna().to_numpy()
+        is_number = np.fromiter(
+            (isinstance(v, (int, float, Decimal)) for v in s), dtype=bool, count=len(s)
+        )
+        numbers = is_number & ~missing
+        result[numbers] = s[numbers].to_numpy().astype(np.float64)
+
+        texts = ~is_number & ~missing
+        raw = s[texts].astype(str)
+        text = raw.str.replace(",", "", regex=False)
+        valid = text.str.fullmatch(_PLAIN_NUMBER_RE.pattern).to_numpy(dtype=bool)
+        if force and not valid.all():
+            text[~valid] = raw[~valid].str.replace(
+                _FORCE_NUMBER_RE.pattern, "", regex=True
+            )
+            valid = text.str.fullmatch(_PLAIN_NUMBER_RE.pattern).to_numpy(dtype=bool)
+        if not valid.all():
+            raise DagError(
+                f"Error in string_to_number_series: {raw[~valid].head().tolist()} "
+                "cannot be interpreted as float."
+            )
+        result[texts] = text.to_numpy(dtype=object).astype(np.float64)
+        return result
+
     @staticmethod
     def format_string(
         x: str,
@@ -134,6 +242,44 @@ class HelperFunctions:
         )
         return HelperFunctions.format_string(x, color)
 
+    @staticmethod
+    def colorize_series_html(
+        s: Union[pd.Series, np.ndarray],
+        test: Union[pd.Series, np.ndarray] = None,
+        color_if_true: str = None,
+        color_if_false: str = None,
+        has_percent: bool = True,
+        add_plus_sign: bool = False,
+    ) -> pd.Series:
+        """
+        Vectorized colorize_number_html for a whole column.
+        :param s: The numbers to colorize.
+        :param test: A boolean mask, one per number. If None, test is s >= 0.
+        :param color_if_true: The color to use where the test is True. If None, use green.
+        :param color_if_false: The color to use where the test is False. If None, use red.
+        :param has_percent: Whether to display as a percentage when 0 < abs(x) < 1.
+        :return: The colorized numbers in HTML format; non-numeric values are left as is.
+        """
+        np, pd = _numpy_pandas()
+
+        values = pd.Series(s, copy=False)
+        x = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+        mask = x >= 0 if test is None else np.asarray(test, dtype=bool)
+        color_true = color_if_true or "#008000"  # green
+        color_false = color_if_false or "#FF0000"  # red
+        tags = np.array(
+            [f'<font color="{color_false}">', f'<font color="{color_true}">'],
+            dtype=object,
+        )
+        html = (
+            tags[mask.astype(np.intp)]
+            + HelperFunctions._short_strings(x, has_percent, add_plus_sign)
+            + "</font>"
+        )
+        not_number = np.isnan(x) & values.notna().to_numpy()
+        html[not_number] = values.to_numpy(dtype=object)[not_number]
+        return pd.Series(html, index=values.index, dtype=object)
+
     @staticmethod
     def df_to_md(df: pd.DataFrame) -> str:
         return f"```{df.to_markdown(index=False, tablefmt='simple')}```"
@@ -184,9 +330,72 @@ class HelperFunctions:
             result = f"{plus_sign}{x:,.0f}"
             return result
 
+    @staticmethod
+    def number_to_short_string_series(
+        s: Union[pd.Series, np.ndarray],
+        has_percent: bool = True,
+        add_plus_sign: bool = False,
+    ) -> pd.Series:
+        """
+        Vectorized number_to_short_string for a whole column.
+        Missing and non-numeric values become empty strings.
+        """
+        np, pd = _numpy_pandas()
+
+        index = s.index if isinstance(s, pd.Series) else None
+        x = pd.to_numeric(pd.Series(s, copy=False), errors="coerce").to_numpy(
+            dtype=np.float64
+        )
+        return pd.Series(
+            HelperFunctions._short_strings(x, has_percent, add_plus_sign),
+            index=index,
+            dtype=object,
+        )
+
+    @staticmethod
+    def _short_strings(
+        x: np.ndarray, has_percent: bool, add_plus_sign: bool
+    ) -> np.ndarray:
+        """
+        number_to_short_string over a float array. Values sharing a format
+        spec are formatted together with one str.format per value, so no
+        per-value Python branching is left.
+        """
+        np, _ = _numpy_pandas()
+
+        out = np.full(len(x), "", dtype=object)
+        sign = "+" if add_plus_sign else ""  # "+" only shows on x > 0
+
+        def put(mask, template, values):
+            if mask.any():
+                out[mask] = list(map(template.format, values[mask].tolist()))
+
+        ax = np.abs(x)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log = np.log10(ax)
+        finite = np.isfinite(log)
+        log[~finite] = 0.0
+        e = np.floor(log).astype(np.int64)
+        e -= ax < 10.0**e  # log10 rounded up just below a power of ten
+
+        out[x == 0] = "0"
+        small = finite & (ax < 1)
+        if has_percent:
+            put(small, f"{{:{sign},.1f}}%", x * 100)
+        elif small.any():
+            decimals = np.trunc(3 - log).astype(np.int64)  # 3 sig fig
+            for d in np.unique(decimals[small]).tolist():
+                put(small & (decimals == d), f"{{:{sign},.{d}f}}", x)
+        rest = ~np.isnan(x) & (ax >= 1)
+        put(rest & ((e >= len(_SHORT_DECIMALS)) | np.isinf(x)), f"{{:{sign},.0f}}", x)
+        for i, d in enumerate(_SHORT_DECIMALS):
+            divisor, unit = _SHORT_UNITS[i // 3]
+            put(rest & finite & (e == i), f"{{:{sign},.{d}f}}{unit}", x / divisor)
+        return out
+
     @staticmethod
     def strip_and_proper(text: str) -> str:
-        text = re.sub(r"\W|_", " ", text)
+        text = _WORD_RE.sub(" ", text)
         return text.strip().title()
 
     @staticmethod
@@ -221,7 +430,19 @@ class HelperFunctions:
 
         return wrapper
 
-    def ic(*args):
+    @staticmethod
+    def ic(*args, **kwargs):
+        """
+        Cheap debug print of values by repr; pass ic(x=x) to label them.
+        Use ic_rich to print the calling expression instead, at the cost of
+        reading the caller's source.
+        """
+        values = [repr(arg) for arg in args]
+        values += [f"{k}={v!r}" for k, v in kwargs.items()]
+        print(f"ic| {' | '.join(values)}")
+
+    @staticmethod
+    def ic_rich(*args):
         frame = inspect.currentframe().f_back
         context = inspect.getframeinfo(frame)
         for arg in args:
@@ -239,6 +460,13 @@ class HelperFunctions:
 
     @staticmethod
     def parse_datetime(date_or_datetime: Union[str, datetime]) -> datetime:
+        """
+        Parse a date or datetime string; returns None when no format matches.
+
+        datetime.fromisoformat is tried first, so ISO inputs with an offset,
+        e.g. "2024-01-05T09:30:00+08:00", now return timezone-aware datetimes
+        and other ISO forms it understands are accepted too.
+        """
         if isinstance(date_or_datetime, datetime):
             return date_or_datetime
         try:
@@ -247,58 +475,91 @@ class HelperFunctions:
             raise DagError(
                 f"Expected str/datetime, got {type(date_or_datetime)}: {date_or_datetime}"
             ) from e
-        for fmt in [
-            "%Y-%m-%d",
-            "%Y-%m-%d %H:%M:%S",
-            "%Y-%m-%dT%H:%M:%S",
-            "%Y-%m-%d %H:%M",
-            "%Y-%m-%dT%H:%M",
-            "%Y-%m-%d %H:%M:%S.%f",
-            "%Y-%m-%dT%H:%M:%S.%f",
-            "%Y%m%d",
-            "%Y%m%d_%H%M",
-            "%Y%m%d_%H%M%S",
-        ]:
+        try:
+            return datetime.fromisoformat(dt_str)
+        except ValueError:
+            pass
+        formats = _DASHED_DT_FORMATS if "-" in dt_str else _COMPACT_DT_FORMATS
+        for fmt in formats:
             try:
-                result = datetime.strptime(dt_str, fmt)
-                return result
+                return datetime.strptime(dt_str, fmt)
             except ValueError:
                 pass
 
     @staticmethod
     def condense_text(text, limit=500):
         text = "(None)" if text is None else str(text)
-        text = re.sub(r"\s*\n+\s*", " | ", text).strip()
-        text = re.sub(r"\s+", " ", text).strip()
-        sql_extract = re.sub(rf"(.{{{limit}}}).*", r"\1...", text)
-        return sql_extract
+        text = _NL_RE.sub(" | ", text).strip()
+        text = _WS_RE.sub(" ", text).strip()
+        return f"{text[:limit]}..." if len(text) >= limit else text
 
     @staticmethod
     def generate_hyperlink_html(text, url):
         return f'<a href="{url}">{text}</a>'
 
     @staticmethod
-    def find_file(
-        file_name: str, sibling_folder_name: str = None, start_path: Path = None
-    ) -> Path:
-        start_path = start_path or Path(__file__).resolve().parent
-        search_paths = [start_path, start_path.parent]
+    @lru_cache(maxsize=None)
+    def _file_index(root: Path) -> dict:
+        """
+        Walk root once and map each file name to every path it appears at.
+        Hidden folders are not descended into, as glob's "**" does; hidden
+        files are indexed since glob matches them when named literally.
+        """
+        index = {}
+        for dir_path, dir_names, file_names in os.walk(root):
+            dir_names[:] = [d for d in dir_names if not d.startswith(".")]
+            for name in file_names:
+                index.setdefault(name, []).append(Path(dir_path) / name)
+        return index
 
-        for parent in search_paths:
-            if sibling_folder_name:
-                search_pattern = str(parent / sibling_folder_name / "**" / file_name)
-            else:
-                search_pattern = str(parent / "**" / file_name)
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _find_file(file_name: str, sibling_folder_name: str, start_path: Path) -> Path:
+        parts = PurePath(file_name).parts
+        for parent in [start_path, start_path.parent]:
+            base = parent / sibling_folder_name if sibling_folder_name else parent
+            for match in HelperFunctions._file_index(base).get(parts[-1], []):
+                if match.parts[-len(parts) :] == parts:
+                    return match
+
+        raise DagError(f"File not found: {file_name}")
 
-            matches = glob.glob(search_pattern, recursive=True)
+    @staticmethod
+    def _glob_file(file_name: str, sibling_folder_name: str, start_path: Path) -> Path:
+        for parent in [start_path, start_path.parent]:
+            base = parent / sibling_folder_name if sibling_folder_name else parent
+            matches = glob.glob(str(base / "**" / file_name), recursive=True)
             if matches:
                 return Path(matches[0])
 
         raise DagError(f"File not found: {file_name}")
 
+    @staticmethod
+    def find_file(
+        file_name: str, sibling_folder_name: str = None, start_path: Path = None
+    ) -> Path:
+        start_path = start_path or Path(__file__).resolve().parent
+        if any(c in file_name for c in "*?["):
+            # Patterns such as "*.sql" can't be looked up by name in the index.
+            return HelperFunctions._glob_file(
+                file_name, sibling_folder_name, start_path
+            )
+        try:
+            match = HelperFunctions._find_file(
+                file_name, sibling_folder_name, start_path
+            )
+            if match.is_file():
+                return match
+        except DagError:
+            pass
+        # The index may predate the file being created, moved or deleted.
+        HelperFunctions._file_index.cache_clear()
+        HelperFunctions._find_file.cache_clear()
+        return HelperFunctions._find_file(file_name, sibling_folder_name, start_path)
+
     @staticmethod
     def back_ticks(text):
-        text = re.sub(r"```", "` ` `", text)
+        text = text.replace("```", "` ` `")
         return f"```\n{text}\n```"
 
     @staticmethod
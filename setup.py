@@ -4,12 +4,18 @@ setup(
     name="gcolab_pkg",
     version="0.1",
     description="A package for Google Colab functionalities.",
-    packages=find_packages(),
+    packages=find_packages(exclude=["tests", "tests.*"]),
+    py_modules=["main"],
+    python_requires=">=3.8",
     install_requires=[
         "google-cloud-bigquery",
+        "google-cloud-bigquery-storage",
+        "pyarrow",
         "pandas",
         "ipython",
         "colorama",
         "pytz",
+        "requests",
     ],
+    extras_require={"async": ["aiohttp"]},
 )
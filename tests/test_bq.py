@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+import pytest
+
+import bq
+from bq import (
+    _canonicalize,
+    _first_page_is_complete,
+    _nondeterministic_calls,
+    _returns_rows,
+)
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("SELECT  a,\n   b   -- note\nFROM t  ", "SELECT a,\nb\nFROM t"),
+        ("-- header\nSELECT 1\n\n# trailing", "SELECT 1"),
+        ("SELECT 'a  -- b' AS c, `x#y`", "SELECT 'a  -- b' AS c, `x#y`"),
+        ("SELECT '''a\n   b'''", "SELECT '''a\n   b'''"),
+        (
+            "SELECT /* don't */ 'a -- b' AS c FROM t",
+            "SELECT /* don't */ 'a -- b' AS c FROM t",
+        ),
+        (
+            "SELECT 1 /* it's the # of rows */ FROM t",
+            "SELECT 1 /* it's the # of rows */ FROM t",
+        ),
+        ("#legacySQL\nSELECT  1  FROM [p:d.t]", "#legacySQL\nSELECT 1 FROM [p:d.t]"),
+        ("  #standardSQL\n-- c\nSELECT 1", "#standardSQL\nSELECT 1"),
+    ],
+)
+def test_canonicalize(query, expected):
+    assert _canonicalize(query) == expected
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("SELECT CURRENT_TIMESTAMP(), rand()", ["CURRENT_TIMESTAMP", "RAND"]),
+        ("SELECT * FROM t WHERE d = current_date", ["CURRENT_DATE"]),
+        ("SELECT 'rand' AS s, `current_date` FROM t", []),
+        ("SELECT 1 /* RAND() */ -- CURRENT_DATE\nFROM t", []),
+    ],
+)
+def test_nondeterministic_calls(query, expected):
+    assert _nondeterministic_calls(query) == expected
+
+
+@pytest.mark.parametrize(
+    "statement_type, dml_stats, ddl_target_table, expected",
+    [
+        ("SELECT", None, None, True),
+        ("SCRIPT", None, None, True),
+        ("INSERT", {"insertedRowCount": 1}, None, False),
+        ("MERGE", {"updatedRowCount": 1}, None, False),
+        ("TRUNCATE_TABLE", None, None, False),
+        ("CREATE_TABLE_AS_SELECT", None, "p.d.t", False),
+        ("DROP_TABLE", None, "p.d.t", False),
+        ("ALTER_TABLE", None, None, False),
+        (None, None, None, True),
+        (None, {"deletedRowCount": 1}, None, False),
+        (None, None, "p.d.t", False),
+    ],
+)
+def test_returns_rows(statement_type, dml_stats, ddl_target_table, expected):
+    job = SimpleNamespace(
+        statement_type=statement_type,
+        dml_stats=dml_stats,
+        ddl_target_table=ddl_target_table,
+    )
+    assert _returns_rows(job) is expected
+
+
+@pytest.mark.parametrize(
+    "first_page, total_rows, expected",
+    [
+        (None, 10, False),
+        ({"rows": [{}] * 10}, 10, True),
+        ({"rows": [{}] * 10, "pageToken": "t"}, 10, True),
+        ({"rows": [{}] * 10, "pageToken": "t"}, 25, False),
+        ({"pageToken": "t"}, None, True),
+        ({}, 0, True),
+    ],
+)
+def test_first_page_is_complete(first_page, total_rows, expected):
+    rows = SimpleNamespace(_first_page_response=first_page, total_rows=total_rows)
+    assert _first_page_is_complete(rows) is expected
+
+
+def test_result_cache_byte_cap(monkeypatch):
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame({"a": range(100)})
+    nbytes = int(df.memory_usage(deep=True).sum())
+    monkeypatch.setattr(bq, "_RESULT_CACHE", bq.collections.OrderedDict())
+    monkeypatch.setattr(bq, "_RESULT_CACHE_MAX_BYTES", 2 * nbytes)
+    for key in "abc":
+        bq._result_cache_put(key, df)
+    assert list(bq._RESULT_CACHE) == ["b", "c"]
+    bq._result_cache_put("big", pd.concat([df] * 3))
+    assert list(bq._RESULT_CACHE) == ["b", "c"]
+    assert bq._result_cache_get("c").equals(df)
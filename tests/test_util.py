@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from util import DagError, HelperFunctions
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("2024-01-05", datetime(2024, 1, 5)),
+        ("2024-1-5", datetime(2024, 1, 5)),
+        ("2024-01-05T09:30:00.5", datetime(2024, 1, 5, 9, 30, 0, 500000)),
+        ("20240105", datetime(2024, 1, 5)),
+        ("20240105_0930", datetime(2024, 1, 5, 9, 30)),
+        ("20240105_930", datetime(2024, 1, 5, 9, 30)),
+        ("20240105_093015", datetime(2024, 1, 5, 9, 30, 15)),
+        ("2024115", datetime(2024, 11, 5)),
+        (
+            "2024-01-05T09:30:00+08:00",
+            datetime(2024, 1, 5, 9, 30, tzinfo=timezone(timedelta(hours=8))),
+        ),
+        ("not a date", None),
+    ],
+)
+def test_parse_datetime(value, expected):
+    assert HelperFunctions.parse_datetime(value) == expected
+
+
+def test_find_file(tmp_path):
+    (tmp_path / "sql" / "sub").mkdir(parents=True)
+    (tmp_path / "sql" / "sub" / "a.sql").touch()
+    (tmp_path / "sql" / ".hidden").touch()
+    expected = tmp_path / "sql" / "sub" / "a.sql"
+    assert HelperFunctions.find_file("a.sql", "sql", tmp_path) == expected
+    assert HelperFunctions.find_file("sub/a.sql", start_path=tmp_path) == expected
+    assert HelperFunctions.find_file("*.sql", "sql", tmp_path) == expected
+    assert HelperFunctions.find_file(".hidden", "sql", tmp_path).name == ".hidden"
+    with pytest.raises(DagError):
+        HelperFunctions.find_file("missing.sql", "sql", tmp_path)
+
+
+def _numbers():
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(0)
+    values = (rng.choice([-1, 1], 2000) * 10 ** rng.uniform(-6, 11, 2000)).tolist()
+    for p in [10.0**k for k in range(-6, 11)]:
+        values += [p, -p, float(np.nextafter(p, 0)), float(np.nextafter(p, 2 * p))]
+    edges = [0.0, 0.9995, 9.995, 99.95, 999.5, 999_999.5, 999_999_999, 5e-324]
+    return values + edges + [float("nan")]
+
+
+@pytest.mark.parametrize("has_percent", [True, False])
+@pytest.mark.parametrize("add_plus_sign", [True, False])
+def test_number_to_short_string_series(has_percent, add_plus_sign):
+    values = _numbers()
+    expected = [
+        HelperFunctions.number_to_short_string(
+            v, has_percent=has_percent, add_plus_sign=add_plus_sign
+        )
+        for v in values
+    ]
+    got = HelperFunctions.number_to_short_string_series(
+        values, has_percent=has_percent, add_plus_sign=add_plus_sign
+    )
+    assert got.tolist() == expected
+
+
+@pytest.mark.parametrize("has_percent", [True, False])
+def test_colorize_series_html(has_percent):
+    values = _numbers() + ["abc", "12", -0.5]
+    expected = [
+        HelperFunctions.colorize_number_html(v, has_percent=has_percent)
+        for v in values
+    ]
+    got = HelperFunctions.colorize_series_html(values, has_percent=has_percent)
+    assert got.tolist() == expected
+
+    test = [i % 2 == 0 for i in range(len(values))]
+    expected = [
+        HelperFunctions.colorize_number_html(v, t, "blue", "gray")
+        for v, t in zip(values, test)
+    ]
+    got = HelperFunctions.colorize_series_html(values, test, "blue", "gray")
+    assert got.tolist() == expected
+
+
+def _string_to_number_or_error(func, value, force):
+    try:
+        return func(value, force=force)
+    except DagError:
+        return DagError
+
+
+@pytest.mark.parametrize("force", [False, True])
+@pytest.mark.parametrize(
+    "value",
+    [
+        "1,234.5",
+        "-5",
+        ".5",
+        "5.",
+        "007",
+        "1e5",
+        " 12 ",
+        "abc",
+        "--5",
+        "5-",
+        "1.2.3",
+        "$1,2",
+        "12abc",
+        "",
+        None,
+        float("nan"),
+        3,
+        2.5,
+        Decimal("1.5"),
+    ],
+)
+def test_string_to_number_series_matches_scalar(value, force):
+    pd = pytest.importorskip("pandas")
+    expected = _string_to_number_or_error(
+        HelperFunctions.string_to_number, value, force
+    )
+    got = _string_to_number_or_error(
+        HelperFunctions.string_to_number_series,
+        pd.Series([value], dtype=object),
+        force,
+    )
+    if expected is DagError:
+        assert got is DagError
+    else:
+        assert got is not DagError and got.tolist() == [expected]